@@ -1,76 +1,107 @@
-from langchain.llms import HuggingFaceHub
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate
+from huggingface_hub import InferenceClient
 import pandas as pd
-import os
+import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+import textwrap
+
+@lru_cache(maxsize=None)
+def _get_client(model_name, token):
+    """Return a shared HuggingFace inference client per (model, token)"""
+    # A single client reuses its HTTP session (and connections) across runs
+    return InferenceClient(model=model_name, token=token)
+
+@lru_cache(maxsize=256)
+def _cached_text_generation(model_name, token, prompt_text, **generation_kwargs):
+    """Generate text for a prompt, memoized at module level across generator instances
+    
+    Raises on failure, so errors are never cached and are retried on the next call.
+    """
+    return _get_client(model_name, token).text_generation(prompt_text, **generation_kwargs)
 
 class AIIInsightsGenerator:
     """Generates AI-powered insights using HuggingFace models"""
     
-    def __init__(self, hf_token=None, model="google/flan-t5-large"):
+    def __init__(self, hf_token=None, model="google/flan-t5-large", max_workers=16):
         self.hf_token = hf_token
         self.model_name = model
-        self.llm_chain = self._initialize_llm_chain()
+        self.max_workers = max_workers  # Concurrent LLM requests
+        self.generation_kwargs = {"max_new_tokens": 200, "temperature": 0.2}
+        self.client = self._initialize_client()
         
         # Define templates
+        # The break comment prompt is split into a static prefix shared by every
+        # row and a dynamic suffix holding only the row values, so the invariant
+        # part stays byte-identical across calls for server-side prefix caching
         self.templates = {
+            'break_comment_prefix': """
+            Analyze this accounting reconciliation break and list possible reasons for the discrepancy.
+            Fields: Date | Account | GL Balance | IHUB Balance | Difference | Previous Difference | Classification
+            """,
+            
             'break_comment': """
-            Analyze this accounting reconciliation break:
-            Date: {asof_date}
-            Account: {account_details}
-            GL Balance: {gl_balance}
-            IHUB Balance: {ihub_balance}
-            Difference: {balance_diff}
-            Previous Difference: {prev_diff}
-            Classification: {classification}
+            {asof_date} | {account_details} | {gl_balance} | {ihub_balance} | {balance_diff} | {prev_diff} | {classification}
             
             Possible reasons for this discrepancy:
             """,
             
+            # Numeric header is formatted locally; only the observations go to the LLM
             'executive_summary': """
-            Summarize these reconciliation results:
+            Reconciliation results:
             Total Records: {total_records}
             Matches: {matches} ({match_pct:.1f}%)
             Breaks: {breaks} ({break_pct:.1f}%)
             Anomalies: {anomalies}
+            """,
+            
+            'summary_observations': """
+            Summarize the key observations for these reconciliation anomalies:
+            {anomaly_rows}
             
             Key observations:
             """
         }
     
-    def _initialize_llm_chain(self):
-        """Initialize the LLM chain with HuggingFace model"""
+    def _initialize_client(self):
+        """Initialize a persistent HuggingFace inference client"""
         if not self.hf_token:
             return None
             
-        os.environ['HUGGINGFACEHUB_API_TOKEN'] = self.hf_token
-        
-        # Initialize HuggingFace model
-        llm = HuggingFaceHub(
-            repo_id=self.model_name,
-            model_kwargs={"temperature": 0.2, "max_length": 200}
-        )
-        
-        return llm
+        return _get_client(self.model_name, self.hf_token)
     
     def _generate_with_llm(self, prompt_text):
         """Generate text using the LLM"""
-        if not self.llm_chain:
+        if not self.client:
             return "Analysis unavailable (no HuggingFace token provided)"
             
         try:
-            return self.llm_chain(prompt_text)
+            # Successful responses are shared by later runs in the same process
+            return _cached_text_generation(
+                self.model_name, self.hf_token, prompt_text, **self.generation_kwargs
+            )
         except Exception as e:
             print(f"LLM generation failed: {str(e)}")
             return "Analysis generation failed"
     
+    def _generate_batch_with_llm(self, prompts):
+        """Generate text for a list of prompts using concurrent requests"""
+        if not self.client:
+            return ["Analysis unavailable (no HuggingFace token provided)"] * len(prompts)
+            
+        # The calls are network-bound, so threads overlap the round-trips;
+        # executor.map keeps responses in prompt order
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._generate_with_llm, prompts))
+    
     def generate_break_comments(self, df):
         """Generate comments for all break records"""
-        if self.llm_chain is None:
-            df['Comments'] = np.where(
-                df['Match Status'] == 'Break',
-                'Discrepancy detected - requires investigation',
-                'Difference within acceptable tolerance'
+        if self.client is None:
+            df['Comments'] = pd.Categorical.from_codes(
+                (df['Match Status'] != 'Break').to_numpy().astype(np.int8),
+                categories=[
+                    'Discrepancy detected - requires investigation',
+                    'Difference within acceptable tolerance'
+                ]
             )
             return df
             
@@ -78,44 +109,72 @@ class AIIInsightsGenerator:
         if breaks_df.empty:
             return df
             
-        # Generate comments
-        comments = []
-        for _, row in breaks_df.iterrows():
-            prompt = self.templates['break_comment'].format(
-                asof_date=row['AsofDate'].strftime('%Y-%m-%d'),
-                account_details=f"{row['Company']}-{row['Account']} ({row['Currency']})",
-                gl_balance=row['GL Balance'],
-                ihub_balance=row['IHUB Balance'],
-                balance_diff=row['Balance Difference'],
-                prev_diff=row.get('Previous Balance Difference', 'N/A'),
-                classification=row.get('Break Classification', 'Unknown')
+        # Build prompts without materializing a Series per row
+        prev_diffs = breaks_df.get('Previous Balance Difference', pd.Series('N/A', index=breaks_df.index))
+        classifications = breaks_df.get('Break Classification', pd.Series('Unknown', index=breaks_df.index))
+        rows = zip(
+            breaks_df[['AsofDate', 'Company', 'Account', 'Currency', 'GL Balance',
+                       'IHUB Balance', 'Balance Difference']].itertuples(index=False, name=None),
+            prev_diffs,
+            classifications
+        )
+        prefix = self.templates['break_comment_prefix']
+        prompts = [
+            prefix + self.templates['break_comment'].format(
+                asof_date=asof_date.strftime('%Y-%m-%d'),
+                account_details=f"{company}-{account} ({currency})",
+                gl_balance=gl_balance,
+                ihub_balance=ihub_balance,
+                balance_diff=balance_diff,
+                prev_diff=prev_diff,
+                classification=classification
             )
-            response = self._generate_with_llm(prompt)
-            comments.append(response)
+            for (asof_date, company, account, currency, gl_balance, ihub_balance, balance_diff),
+                prev_diff, classification in rows
+        ]
         
-        breaks_df['Comments'] = comments
-        df.update(breaks_df)
+        # Generate comments concurrently
+        df['Comments'] = pd.Series(self._generate_batch_with_llm(prompts), index=breaks_df.index)
         return df
     
-    def generate_executive_summary(self, df):
+    def generate_executive_summary(self, df, max_anomalies=20):
         """Generate an executive summary report"""
-        if self.llm_chain is None:
-            return "AI summary unavailable (no HuggingFace token provided)"
-            
         # Calculate metrics
         total_records = len(df)
         matches = len(df[df['Match Status'] == 'Match'])
         breaks = total_records - matches
         anomalies = df['Is Anomaly'].sum()
+        match_pct = (matches/total_records)*100 if total_records else 0.0
+        break_pct = (breaks/total_records)*100 if total_records else 0.0
         
-        # Generate summary
-        prompt = self.templates['executive_summary'].format(
+        header = textwrap.dedent(self.templates['executive_summary']).strip().format(
             total_records=total_records,
             matches=matches,
-            match_pct=(matches/total_records)*100,
+            match_pct=match_pct,
             breaks=breaks,
-            break_pct=(breaks/total_records)*100,
+            break_pct=break_pct,
             anomalies=anomalies
         )
         
-        return self._generate_with_llm(prompt)
\ No newline at end of file
+        if self.client is None:
+            return header + "\nKey observations: AI summary unavailable (no HuggingFace token provided)"
+        
+        # Compact serialization of the most anomalous rows
+        anomaly_df = df[df['Is Anomaly'] == 1]
+        if 'Anomaly Score' in anomaly_df.columns:
+            anomaly_df = anomaly_df.nlargest(max_anomalies, 'Anomaly Score')
+        else:
+            anomaly_df = anomaly_df.head(max_anomalies)
+        anomaly_rows = "\n".join(
+            f"{company}-{account} ({currency}): {balance_diff:.2f}, {classification}"
+            for company, account, currency, balance_diff, classification in zip(
+                anomaly_df['Company'],
+                anomaly_df['Account'],
+                anomaly_df['Currency'],
+                anomaly_df['Balance Difference'],
+                anomaly_df.get('Break Classification', pd.Series('Unknown', index=anomaly_df.index))
+            )
+        ) or "None"
+        
+        prompt = self.templates['summary_observations'].format(anomaly_rows=anomaly_rows)
+        return header + "\nKey observations: " + self._generate_with_llm(prompt)
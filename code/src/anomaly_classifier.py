@@ -1,6 +1,56 @@
 import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to NumPy masks
+    njit = None
+
+# Break labels indexed by classification code, in rule priority order
+BREAK_LABELS = np.array([
+    'Within Tolerance',
+    'Small Difference',
+    'New Difference',
+    'Large Difference',
+    'Significant Variance',
+    'Direction Change',
+    'Consistent Difference',
+    'Moderate Difference'
+], dtype=object)
+
+
+def _classify_codes_kernel(current_diff, prev_diff, is_match, small, large, variance, out):
+    """Scalar classification loop writing label codes into out (ndarrays only)"""
+    for i in range(current_diff.shape[0]):
+        if is_match[i]:
+            out[i] = 0
+            continue
+        
+        cur = current_diff[i]
+        prev = prev_diff[i]
+        abs_diff = abs(cur)
+        abs_prev_diff = 0.0 if np.isnan(prev) else abs(prev)
+        
+        if abs_diff < small:
+            out[i] = 1
+        elif np.isnan(prev):
+            out[i] = 2
+        elif abs_diff > large:
+            out[i] = 3
+        elif abs(cur - prev) > variance * abs_prev_diff:
+            out[i] = 4
+        elif np.sign(cur) != np.sign(prev):
+            out[i] = 5
+        elif abs(cur - prev) < 0.1 * abs_prev_diff:
+            out[i] = 6
+        else:
+            out[i] = 7
+    return out
+
+
+if njit is not None:
+    _classify_codes_kernel = njit(cache=True)(_classify_codes_kernel)
+
 class HybridAnomalyClassifier:
     """Combines rules and statistical methods for break classification"""
     
@@ -47,5 +97,46 @@ class HybridAnomalyClassifier:
         if 'Match Status' not in df.columns:
             raise ValueError("Match Status column not found. Run reconciliation first.")
         
-        df['Break Classification'] = df.apply(self.classify_break, axis=1)
-        return df
\ No newline at end of file
+        current_diff = df['Balance Difference'].to_numpy(dtype=np.float64)
+        if 'Previous Balance Difference' in df.columns:
+            prev_diff = df['Previous Balance Difference'].to_numpy(dtype=np.float64)
+        else:
+            prev_diff = np.zeros(len(df))
+        is_match = (df['Match Status'] == 'Match').to_numpy()
+        
+        df['Break Classification'] = self.classify(current_diff, prev_diff, is_match)
+        return df
+    
+    def classify(self, current_diff, prev_diff, is_match):
+        """Classify records from pre-extracted arrays, returning a categorical"""
+        codes = self._classify_codes(current_diff, prev_diff, is_match)
+        return pd.Categorical.from_codes(codes, categories=BREAK_LABELS)
+    
+    def _classify_codes(self, current_diff, prev_diff, is_match):
+        """Compute label codes with the jitted loop, or NumPy masks without Numba"""
+        if njit is not None:
+            out = np.empty(len(current_diff), dtype=np.int8)
+            return _classify_codes_kernel(
+                current_diff, prev_diff, is_match,
+                self.thresholds['small_difference'],
+                self.thresholds['large_difference'],
+                self.thresholds['significant_variance'],
+                out
+            )
+        
+        abs_diff = np.abs(current_diff)
+        abs_prev_diff = np.abs(np.nan_to_num(prev_diff))
+        delta = np.abs(current_diff - prev_diff)
+        
+        # Conditions in the same priority order as classify_break
+        conditions = [
+            is_match,
+            abs_diff < self.thresholds['small_difference'],
+            np.isnan(prev_diff),
+            abs_diff > self.thresholds['large_difference'],
+            delta > (self.thresholds['significant_variance'] * abs_prev_diff),
+            np.sign(current_diff) != np.sign(prev_diff),
+            delta < 0.1 * abs_prev_diff
+        ]
+        
+        return np.select(conditions, np.arange(len(conditions), dtype=np.int8), default=7).astype(np.int8)
@@ -10,45 +10,41 @@ class AnomalyDetector:
         self.model = IsolationForest(
             contamination=contamination, 
             random_state=42,
-            n_estimators=100
+            n_estimators=100,
+            max_samples='auto',  # min(256, n_samples) per tree
+            n_jobs=-1
         )
         self.scaler = StandardScaler()
     
     def detect_anomalies(self, df):
-        """Detect statistical anomalies in the breaks"""
-        breaks_df = df[df['Match Status'] == 'Break'].copy()
+        """Detect statistical anomalies in the breaks and score all records"""
+        anomaly_scores, is_anomaly = self.score(
+            df['Balance Difference'].to_numpy(dtype=np.float64),
+            df['Previous Balance Difference'].to_numpy(dtype=np.float64),
+            (df['Match Status'] == 'Break').to_numpy()
+        )
+        df['Is Anomaly'] = is_anomaly
+        df['Anomaly Score'] = anomaly_scores
+        return df
+    
+    def score(self, current_diff, prev_diff, break_mask):
+        """Fit on the breaks and score all records from pre-extracted arrays
         
-        if breaks_df.empty:
-            df['Is Anomaly'] = 0
-            return df
+        Returns (anomaly_scores, is_anomaly); higher score = more anomalous.
+        """
+        is_anomaly = np.zeros(len(current_diff), dtype=np.int8)
+        if not break_mask.any():
+            return np.zeros(len(current_diff)), is_anomaly
         
         # Prepare features for anomaly detection
-        features = breaks_df[['Balance Difference', 'Previous Balance Difference']].fillna(0)
-        scaled_features = self.scaler.fit_transform(features)
+        features = np.column_stack((current_diff, prev_diff))
+        features[np.isnan(features)] = 0
+        self.model.fit(self.scaler.fit_transform(features[break_mask]))
         
-        # Predict anomalies
-        breaks_df['Is Anomaly'] = self.model.fit_predict(scaled_features)
-        breaks_df['Is Anomaly'] = breaks_df['Is Anomaly'].map({1: 0, -1: 1})  # Convert to binary
+        # Score all records in a single pass
+        anomaly_scores = -self.model.score_samples(self.scaler.transform(features))
         
-        # Update original dataframe
-        df = df.merge(
-            breaks_df[['Is Anomaly']],
-            left_index=True,
-            right_index=True,
-            how='left',
-            suffixes=('', '_y')
-        )
-        df['Is Anomaly'] = df['Is Anomaly'].fillna(0).astype(int)
+        # Derive binary labels for breaks from the scores (same rule as IsolationForest.predict)
+        is_anomaly[break_mask] = anomaly_scores[break_mask] > -self.model.offset_
         
-        return df
-    
-    def calculate_anomaly_scores(self, df):
-        """Calculate anomaly scores for all records"""
-        features = df[['Balance Difference', 'Previous Balance Difference']].fillna(0)
-        if len(features) == 0:
-            df['Anomaly Score'] = 0
-            return df
-            
-        scaled_features = self.scaler.transform(features)
-        df['Anomaly Score'] = -self.model.score_samples(scaled_features)  # Higher score = more anomalous
-        return df
\ No newline at end of file
+        return anomaly_scores, is_anomaly
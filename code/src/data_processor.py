@@ -5,8 +5,9 @@ from datetime import datetime
 class DataProcessor:
     """Handles data ingestion, cleaning, preprocessing and feature engineering"""
     
-    def __init__(self, file_path):
+    def __init__(self, file_path, engine='pandas'):
         self.file_path = file_path
+        self.engine = engine  # 'pandas' or 'polars' (multi-threaded transforms)
         self.df = None
         self.required_columns = [
             'AsofDate', 'Company', 'Account', 'AU', 'Currency',
@@ -16,11 +17,14 @@ class DataProcessor:
             'Company', 'Account', 'AU', 'Currency',
             'Primary Account', 'Secondary Account'
         ]
+        self.key_columns = [
+            'Company', 'Account', 'AU', 'Currency', 'Primary Account'
+        ]
     
     def load_data(self):
         """Load and validate the Excel file"""
         try:
-            self.df = pd.read_excel(self.file_path)
+            self.df = self._read_excel()
             
             # Validate required columns
             missing_cols = [col for col in self.required_columns if col not in self.df.columns]
@@ -31,6 +35,14 @@ class DataProcessor:
         except Exception as e:
             raise ValueError(f"Error loading file: {str(e)}")
     
+    def _read_excel(self):
+        """Read the Excel file with the Rust calamine reader, or openpyxl if unavailable"""
+        try:
+            return pd.read_excel(self.file_path, engine='calamine')
+        except (ImportError, ValueError):
+            # python-calamine not installed or pandas < 2.2
+            return pd.read_excel(self.file_path)
+    
     def clean_data(self):
         """Perform data cleaning operations"""
         if self.df is None:
@@ -45,11 +57,17 @@ class DataProcessor:
         numeric_cols = ['GL Balance', 'IHUB Balance']
         for col in numeric_cols:
             if col in self.df.columns:
-                # Remove any non-numeric characters
-                self.df[col] = pd.to_numeric(
-                    self.df[col].astype(str).str.replace(r'[^\d.-]', '', regex=True),
-                    errors='coerce'
-                )
+                # Fast path: most values are already numeric
+                values = pd.to_numeric(self.df[col], errors='coerce')
+                
+                # Remove any non-numeric characters only where the fast path failed
+                mask = values.isna() & self.df[col].notna()
+                if mask.any():
+                    values[mask] = pd.to_numeric(
+                        self.df.loc[mask, col].astype(str).str.replace(r'[^\d.-]', '', regex=True),
+                        errors='coerce'
+                    )
+                self.df[col] = values
                 
         # Handle date conversion
         self.df['AsofDate'] = pd.to_datetime(self.df['AsofDate'], errors='coerce')
@@ -59,84 +77,121 @@ class DataProcessor:
         
         return self
     
-    def preprocess_data(self):
-        """Perform data preprocessing and feature engineering"""
+    def _composite_key(self):
+        """Build a dense int64 composite key from the key columns' category codes"""
+        composite_key = np.zeros(len(self.df), dtype=np.int64)
+        for col in self.key_columns:
+            categories = self.df[col].astype('category').cat
+            composite_key = composite_key * len(categories.categories) + categories.codes.to_numpy()
+            # Re-densify so the running key stays below len(df) and cannot overflow int64
+            composite_key = pd.factorize(composite_key, sort=True)[0].astype(np.int64)
+        return composite_key
+    
+    @staticmethod
+    def _previous_differences(keys, balance_diff):
+        """Shift differences by one row, with NaN at every composite key boundary"""
+        # Rows must be sorted by (CompositeKey, AsofDate)
+        prev_diff = np.empty_like(balance_diff)
+        boundary = np.empty(len(keys), dtype=bool)
+        if len(keys):
+            prev_diff[1:] = balance_diff[:-1]
+            boundary[0] = True
+            boundary[1:] = keys[1:] != keys[:-1]
+        prev_diff[boundary] = np.nan
+        return prev_diff
+    
+    def _build_result(self):
+        """Preprocess, calculate differences and order columns in a single pass
+        
+        Rounds balances, sorts by (composite key, date), derives the difference
+        columns and match status, and returns the frame in output column order.
+        """
         if self.df is None:
             raise ValueError("Data not cleaned. Call clean_data() first.")
             
-        # Ensure numeric columns have proper precision
-        self.df['GL Balance'] = self.df['GL Balance'].round(2)
-        self.df['IHUB Balance'] = self.df['IHUB Balance'].round(2)
+        # Sort once by composite key and date, then permute all arrays together
+        composite_key = self._composite_key()
+        order = np.lexsort((self.df['AsofDate'].to_numpy(), composite_key))
+        composite_key = composite_key[order]
         
-        # Create composite key for grouping
-        self.df['CompositeKey'] = (
-            self.df['Company'] + '_' + 
-            self.df['Account'] + '_' + 
-            self.df['AU'] + '_' + 
-            self.df['Currency'] + '_' + 
-            self.df['Primary Account']
-        )
+        gl_balance = self.df['GL Balance'].to_numpy(dtype=np.float64)[order].round(2)
+        ihub_balance = self.df['IHUB Balance'].to_numpy(dtype=np.float64)[order].round(2)
+        balance_diff = gl_balance - ihub_balance
+        abs_diff = np.abs(balance_diff)
+        pct_diff = np.full_like(balance_diff, np.nan)
+        np.divide(balance_diff, ihub_balance, out=pct_diff, where=ihub_balance != 0)
+        pct_diff *= 100
+        prev_diff = self._previous_differences(composite_key, balance_diff)
         
-        # Sort by composite key and date for proper differencing
-        self.df = self.df.sort_values(['CompositeKey', 'AsofDate'])
+        columns = {col: self.df[col].to_numpy()[order] for col in self.required_columns}
+        columns.update({
+            'GL Balance': gl_balance,
+            'IHUB Balance': ihub_balance,
+            'Balance Difference': balance_diff,
+            'Abs Difference': abs_diff,
+            'Pct Difference': pct_diff,
+            'Previous Balance Difference': prev_diff,
+            'Difference Change': balance_diff - prev_diff,
+            'Match Status': pd.Categorical.from_codes(
+                (abs_diff >= 1).astype(np.int8),
+                categories=['Match', 'Break']
+            )
+        })
         
-        return self
+        self.df = pd.DataFrame(columns, index=self.df.index[order])
+        return self.df
     
-    def calculate_differences(self):
-        """Calculate balance differences and match status"""
+    def _build_result_polars(self):
+        """Multi-threaded equivalent of _build_result using a lazy Polars query"""
         if self.df is None:
-            raise ValueError("Data not preprocessed. Call preprocess_data() first.")
+            raise ValueError("Data not cleaned. Call clean_data() first.")
             
-        self.df['Balance Difference'] = self.df['GL Balance'] - self.df['IHUB Balance']
-        self.df['Abs Difference'] = self.df['Balance Difference'].abs()
-        self.df['Match Status'] = np.where(
-            self.df['Abs Difference'] < 1, 'Match', 'Break'
-        )
+        import polars as pl
         
-        # Add percentage difference
-        self.df['Pct Difference'] = np.where(
-            self.df['IHUB Balance'] != 0,
-            (self.df['Balance Difference'] / self.df['IHUB Balance']) * 100,
-            np.nan
+        result = (
+            pl.from_pandas(self.df[self.required_columns])
+            .lazy()
+            .with_columns(
+                pl.Series('CompositeKey', self._composite_key()),
+                pl.Series('_row_index', self.df.index.to_numpy()),
+                pl.col('GL Balance').cast(pl.Float64).round(2),
+                pl.col('IHUB Balance').cast(pl.Float64).round(2)
+            )
+            .sort(['CompositeKey', 'AsofDate'], maintain_order=True)
+            .with_columns(
+                (pl.col('GL Balance') - pl.col('IHUB Balance')).alias('Balance Difference')
+            )
+            .with_columns(
+                pl.col('Balance Difference').abs().alias('Abs Difference'),
+                pl.when(pl.col('IHUB Balance') != 0)
+                .then(pl.col('Balance Difference') / pl.col('IHUB Balance') * 100)
+                .otherwise(None)
+                .alias('Pct Difference'),
+                pl.col('Balance Difference').shift(1).over('CompositeKey').alias('Previous Balance Difference')
+            )
+            .with_columns(
+                (pl.col('Balance Difference') - pl.col('Previous Balance Difference')).alias('Difference Change'),
+                pl.when(pl.col('Abs Difference') < 1)
+                .then(pl.lit('Match'))
+                .otherwise(pl.lit('Break'))
+                .alias('Match Status')
+            )
+            .drop('CompositeKey')
+            .collect()
+            .to_pandas()
         )
         
-        return self
-    
-    def add_previous_differences(self):
-        """Add previous balance difference for each group"""
-        if self.df is None:
-            raise ValueError("Differences not calculated. Call calculate_differences() first.")
-            
-        # Calculate previous difference using the composite key
-        self.df['Previous Balance Difference'] = self.df.groupby('CompositeKey')['Balance Difference'].shift(1)
-        self.df['Difference Change'] = self.df['Balance Difference'] - self.df['Previous Balance Difference']
-        
-        return self
-    
-    def get_processed_data(self):
-        """Return the fully processed dataframe"""
-        if self.df is None:
-            raise ValueError("Processing not complete. Run all steps first.")
-            
-        # Drop temporary columns
-        result = self.df.drop(columns=['CompositeKey'], errors='ignore')
-        
-        # Ensure proper column order
-        column_order = self.required_columns + [
-            'Balance Difference', 'Abs Difference', 'Pct Difference',
-            'Previous Balance Difference', 'Difference Change',
-            'Match Status'
-        ]
+        # Convert back to the pandas index and dtypes used downstream
+        result.index = pd.Index(result.pop('_row_index').to_numpy(), name=self.df.index.name)
+        result['Match Status'] = pd.Categorical(result['Match Status'], categories=['Match', 'Break'])
         
-        return result[[col for col in column_order if col in result.columns]]
+        self.df = result
+        return self.df
     
     def full_pipeline(self):
         """Execute the complete data processing pipeline"""
-        return (
-            self.load_data()
-            .clean_data()
-            .preprocess_data()
-            .calculate_differences()
-            .add_previous_differences()
-            .get_processed_data()
-        )
+        self.load_data().clean_data()
+        
+        if self.engine == 'polars':
+            return self._build_result_polars()
+        return self._build_result()
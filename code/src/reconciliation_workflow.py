@@ -2,14 +2,18 @@ from data_processor import DataProcessor
 from anomaly_detector import AnomalyDetector
 from anomaly_classifier import HybridAnomalyClassifier
 from ai_insights import AIIInsightsGenerator
+import numpy as np
+import os
 
 class ReconciliationWorkflow:
     """Orchestrates the complete reconciliation process with HuggingFace"""
     
-    def __init__(self, input_path, output_path, hf_token=None):
+    def __init__(self, input_path, output_path, hf_token=None, output_format='parquet', engine='pandas'):
         self.input_path = input_path
         self.output_path = output_path
         self.hf_token = hf_token
+        self.output_format = output_format  # 'parquet' or 'excel'
+        self.engine = engine  # DataProcessor engine: 'pandas' or 'polars'
         self.results = None
     
     def execute(self):
@@ -17,19 +21,25 @@ class ReconciliationWorkflow:
         try:
             # 1. Data Processing
             print("Processing data...")
-            processor = DataProcessor(self.input_path)
+            processor = DataProcessor(self.input_path, engine=self.engine)
             df = processor.full_pipeline()
             
+            # Extract the shared columns once for both detection and classification
+            current_diff = df['Balance Difference'].to_numpy(dtype=np.float64)
+            prev_diff = df['Previous Balance Difference'].to_numpy(dtype=np.float64)
+            break_mask = (df['Match Status'] == 'Break').to_numpy()
+            
             # 2. Anomaly Detection
             print("Detecting anomalies...")
             detector = AnomalyDetector()
-            df = detector.detect_anomalies(df)
-            df = detector.calculate_anomaly_scores(df)
+            anomaly_scores, is_anomaly = detector.score(current_diff, prev_diff, break_mask)
+            df['Is Anomaly'] = is_anomaly
+            df['Anomaly Score'] = anomaly_scores
             
             # 3. Break Classification
             print("Classifying breaks...")
             classifier = HybridAnomalyClassifier()
-            df = classifier.classify_all(df)
+            df['Break Classification'] = classifier.classify(current_diff, prev_diff, ~break_mask)
             
             # 4. AI Insights with HuggingFace
             print("Generating insights with HuggingFace...")
@@ -51,15 +61,20 @@ class ReconciliationWorkflow:
     def _save_results(self, df, summary):
         """Save results to output file"""
         # Save detailed results
-        df.to_excel(self.output_path, index=False)
+        if self.output_format == 'excel':
+            results_path = self.output_path
+            df.to_excel(results_path, index=False, engine='xlsxwriter')
+        else:
+            results_path = os.path.splitext(self.output_path)[0] + '.parquet'
+            df.to_parquet(results_path, index=False, compression='zstd')
         
         # Save summary to text file
-        summary_path = self.output_path.replace('.xlsx', '_summary.txt')
+        summary_path = os.path.splitext(self.output_path)[0] + '_summary.txt'
         with open(summary_path, 'w') as f:
             f.write(summary)
         
         self.results = df
-        print(f"\nResults saved to: {self.output_path}")
+        print(f"\nResults saved to: {results_path}")
         print(f"Summary saved to: {summary_path}")
 
 if __name__ == "__main__":
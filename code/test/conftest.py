@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Make the modules in code/src importable from the tests
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
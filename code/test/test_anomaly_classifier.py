@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import anomaly_classifier
+from anomaly_classifier import HybridAnomalyClassifier
+
+
+def _edge_case_frame():
+    """Breaks and matches covering every rule, NaNs, sign flips and exact thresholds"""
+    rows = [
+        # (Match Status, Balance Difference, Previous Balance Difference)
+        ('Match', 0.5, np.nan),
+        ('Match', 50000.0, 10.0),
+        ('Break', 0.5, 100.0),          # small difference
+        ('Break', -0.99, np.nan),       # small difference beats new difference
+        ('Break', 1.0, np.nan),         # exactly at small threshold -> new difference
+        ('Break', 250.0, np.nan),       # new difference
+        ('Break', 10000.0, 10000.0),    # exactly at large threshold -> not large
+        ('Break', 10000.01, 10000.0),   # large difference
+        ('Break', -20000.0, 5.0),       # large difference, negative
+        ('Break', 300.0, 100.0),        # significant variance
+        ('Break', 150.0, 100.0),        # delta exactly 0.5 * prev -> not significant
+        ('Break', -40.0, 100.0),        # sign flip beyond variance -> significant variance
+        ('Break', -30.0, 40.0),         # sign flip with delta > 0.5 * prev
+        ('Break', 5.0, -4.0),           # sign flip beyond variance
+        ('Break', 5.0, 0.0),            # previous zero, sign differs
+        ('Break', 110.0, 100.0),        # delta exactly 0.1 * prev -> moderate
+        ('Break', 105.0, 100.0),        # consistent difference
+        ('Break', -105.0, -100.0),      # consistent difference, negative
+        ('Break', 120.0, 100.0),        # moderate difference
+        ('Break', 100.0, 100.0),        # unchanged -> consistent difference
+    ]
+    return pd.DataFrame(rows, columns=['Match Status', 'Balance Difference', 'Previous Balance Difference'])
+
+
+def _expected(classifier, df):
+    return [classifier.classify_break(row) for _, row in df.iterrows()]
+
+
+@pytest.mark.parametrize('significant_variance', [0.5, 5.0], ids=['default', 'wide-variance'])
+@pytest.mark.parametrize('use_kernel', [True, False], ids=['kernel', 'numpy'])
+def test_classify_all_matches_classify_break(monkeypatch, use_kernel, significant_variance):
+    df = _edge_case_frame()
+    classifier = HybridAnomalyClassifier()
+    # A wide variance threshold lets sign flips reach the Direction Change rule
+    classifier.thresholds['significant_variance'] = significant_variance
+    expected = _expected(classifier, df)
+    
+    if use_kernel:
+        # Without Numba the kernel still runs as plain Python
+        if anomaly_classifier.njit is None:
+            monkeypatch.setattr(anomaly_classifier, 'njit', object())
+    else:
+        monkeypatch.setattr(anomaly_classifier, 'njit', None)
+    
+    result = classifier.classify_all(df.copy())
+    
+    assert list(result['Break Classification']) == expected
+    if significant_variance > 1:
+        assert 'Direction Change' in expected
+
+
+def test_classify_all_without_previous_difference_column():
+    df = _edge_case_frame().drop(columns=['Previous Balance Difference'])
+    classifier = HybridAnomalyClassifier()
+    expected = _expected(classifier, df)
+    
+    result = classifier.classify_all(df.copy())
+    
+    assert list(result['Break Classification']) == expected
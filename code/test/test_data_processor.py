@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processor import DataProcessor
+
+
+def _cleaned_processor():
+    """DataProcessor holding a cleaned frame with a non-default, unsorted index"""
+    rng = np.random.default_rng(7)
+    n = 300
+    df = pd.DataFrame({
+        'AsofDate': pd.to_datetime('2024-01-01') + pd.to_timedelta(rng.integers(0, 30, n), unit='D'),
+        'Company': rng.choice(['C1', 'C2'], n),
+        'Account': rng.choice(['100', '200', '300'], n),
+        'AU': rng.choice(['AU1', 'AU2'], n),
+        'Currency': rng.choice(['USD', 'EUR'], n),
+        'Primary Account': rng.choice(['P1', 'P2'], n),
+        'Secondary Account': 'S1',
+        'GL Balance': rng.normal(1000, 500, n).round(3),
+        'IHUB Balance': rng.normal(1000, 500, n).round(3)
+    }, index=rng.permutation(np.arange(1000, 1000 + n)))
+    
+    # Exercise exact matches and zero IHUB balances
+    df.iloc[:20, df.columns.get_loc('IHUB Balance')] = df['GL Balance'].iloc[:20]
+    df.iloc[20:30, df.columns.get_loc('IHUB Balance')] = 0.0
+    
+    processor = DataProcessor(None)
+    processor.df = df
+    return processor
+
+
+def test_build_result_sorts_and_shifts_within_key():
+    result = _cleaned_processor()._build_result()
+    
+    groups = result.groupby(['Company', 'Account', 'AU', 'Currency', 'Primary Account'], sort=False)
+    expected_prev = groups['Balance Difference'].shift(1)
+    
+    assert groups['AsofDate'].apply(lambda s: s.is_monotonic_increasing).all()
+    np.testing.assert_array_equal(result['Previous Balance Difference'].to_numpy(), expected_prev.to_numpy())
+
+
+def test_polars_engine_matches_pandas_engine():
+    pytest.importorskip('polars')
+    
+    expected = _cleaned_processor()._build_result()
+    result = _cleaned_processor()._build_result_polars()
+    
+    pd.testing.assert_index_equal(result.index, expected.index)
+    assert list(result.columns) == list(expected.columns)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_exact=False)